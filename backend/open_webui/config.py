@@ -1976,6 +1976,35 @@ OPENSEARCH_CERT_VERIFY = (
 )
 OPENSEARCH_USERNAME = os.environ.get("OPENSEARCH_USERNAME", None)
 OPENSEARCH_PASSWORD = os.environ.get("OPENSEARCH_PASSWORD", None)
+OPENSEARCH_BULK_CHUNK_SIZE = int(os.environ.get("OPENSEARCH_BULK_CHUNK_SIZE", "1000"))
+OPENSEARCH_BULK_MAX_BYTES = int(
+    os.environ.get("OPENSEARCH_BULK_MAX_BYTES", str(10 * 1024 * 1024))
+)
+OPENSEARCH_INDEX_EXISTS_CACHE_TTL = max(
+    int(os.environ.get("OPENSEARCH_INDEX_EXISTS_CACHE_TTL", "300")), 5
+)
+# Metadata fields answered from an in-process id index for equality queries.
+# Only correct when this process sees every write: it is disabled when
+# UVICORN_WORKERS > 1, and must not be set when running several replicas.
+OPENSEARCH_METADATA_CACHE_FIELDS = [
+    field.strip()
+    for field in os.environ.get("OPENSEARCH_METADATA_CACHE_FIELDS", "").split(",")
+    if field.strip()
+]
+# Total document ids kept in that index; an index that overflows it stops being tracked
+OPENSEARCH_METADATA_CACHE_MAX_IDS = int(
+    os.environ.get("OPENSEARCH_METADATA_CACHE_MAX_IDS", "100000")
+)
+# Semantic cache of search results; size is entries per index, 0 disables it
+OPENSEARCH_SEARCH_CACHE_SIZE = int(os.environ.get("OPENSEARCH_SEARCH_CACHE_SIZE", "0"))
+OPENSEARCH_SEARCH_CACHE_THRESHOLD = float(
+    os.environ.get("OPENSEARCH_SEARCH_CACHE_THRESHOLD", "0.98")
+)
+OPENSEARCH_SEARCH_CACHE_TTL = int(os.environ.get("OPENSEARCH_SEARCH_CACHE_TTL", "300"))
+# Server-side scalar quantization for new indices: "", "fp16" or "int8"
+OPENSEARCH_VECTOR_QUANTIZATION = os.environ.get(
+    "OPENSEARCH_VECTOR_QUANTIZATION", ""
+).lower()
 
 # ElasticSearch
 ELASTICSEARCH_URL = os.environ.get("ELASTICSEARCH_URL", "https://localhost:9200")
@@ -1,6 +1,14 @@
-from opensearchpy import OpenSearch
-from opensearchpy.helpers import bulk
-from typing import Optional
+import logging
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+import orjson
+from opensearchpy import OpenSearch, Urllib3HttpConnection
+from opensearchpy.exceptions import SerializationError
+from opensearchpy.helpers import BulkIndexError, parallel_bulk, scan, streaming_bulk
+from opensearchpy.serializer import JSONSerializer
+from typing import Callable, Optional
 
 from open_webui.retrieval.vector.utils import stringify_metadata
 from open_webui.retrieval.vector.main import (
@@ -15,7 +23,260 @@ from open_webui.config import (
     OPENSEARCH_CERT_VERIFY,
     OPENSEARCH_USERNAME,
     OPENSEARCH_PASSWORD,
+    OPENSEARCH_BULK_CHUNK_SIZE,
+    OPENSEARCH_BULK_MAX_BYTES,
+    OPENSEARCH_INDEX_EXISTS_CACHE_TTL,
+    OPENSEARCH_VECTOR_QUANTIZATION,
+    OPENSEARCH_METADATA_CACHE_FIELDS,
+    OPENSEARCH_METADATA_CACHE_MAX_IDS,
+    OPENSEARCH_SEARCH_CACHE_SIZE,
+    OPENSEARCH_SEARCH_CACHE_THRESHOLD,
+    OPENSEARCH_SEARCH_CACHE_TTL,
 )
+from open_webui.env import SRC_LOG_LEVELS, UVICORN_WORKERS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Bulk writes of at least this many items pause index refreshes until done.
+BULK_REFRESH_DISABLE_THRESHOLD = 500
+# Deletes of at least this many ids run as delete_by_query on a terms filter,
+# sent in chunks well below the default index.max_terms_count of 65536.
+DELETE_BY_QUERY_THRESHOLD = 100
+DELETE_BY_QUERY_CHUNK_SIZE = 10000
+# Maximum length of the index list in a single reset() delete request.
+RESET_DELETE_MAX_PATH_LENGTH = 3000
+# Stored fields returned by reads; shared across requests and never mutated.
+SOURCE_FIELDS = ["text", "metadata"]
+
+
+class ORJSONSerializer(JSONSerializer):
+    """JSON serializer backed by orjson, which encodes the float-heavy
+    vector payloads of bulk requests much faster than the stdlib."""
+
+    def loads(self, s):
+        return orjson.loads(s)
+
+    def dumps(self, data):
+        if isinstance(data, str):
+            return data
+        try:
+            return orjson.dumps(
+                data,
+                default=self.default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            ).decode("utf-8")
+        except (ValueError, TypeError) as e:
+            raise SerializationError(data, e)
+
+
+class MetadataIdIndex:
+    """In-process index of document ids by metadata value, used to answer
+    equality queries without a search. Only indices created by this process
+    are tracked, and it is only correct if this process sees every write to
+    them (a single worker and replica). Values are keyed by their string form,
+    as the .keyword term filter compares them."""
+
+    def __init__(self, fields: list[str], max_ids: int):
+        self.fields = fields
+        self.max_ids = max_ids
+        # Index name -> id -> (write sequence, {field: value})
+        self._docs: dict[str, dict[str, tuple[int, dict[str, str]]]] = {}
+        # Index name -> field -> value -> ids
+        self._values: dict[str, dict[str, dict[str, set[str]]]] = {}
+        self._size = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def track(self, index_name: str):
+        with self._lock:
+            self._drop(index_name)
+            self._docs[index_name] = {}
+            self._values[index_name] = {field: {} for field in self.fields}
+
+    def drop(self, index_name: Optional[str] = None):
+        with self._lock:
+            if index_name is None:
+                self._docs.clear()
+                self._values.clear()
+                self._size = 0
+            else:
+                self._drop(index_name)
+
+    def _drop(self, index_name: str):
+        self._size -= len(self._docs.pop(index_name, {}))
+        self._values.pop(index_name, None)
+
+    def _unlink(self, index_name: str, id: str, fields: dict[str, str]):
+        values = self._values[index_name]
+        for field, value in fields.items():
+            ids = values[field].get(value)
+            if ids is not None:
+                ids.discard(id)
+                if not ids:
+                    del values[field][value]
+
+    def add(self, index_name: str, items: list[VectorItem], merge: bool = False):
+        # merge mirrors a partial update: fields missing from the new metadata
+        # keep their stored values.
+        with self._lock:
+            docs = self._docs.get(index_name)
+            if docs is None:
+                return
+
+            values = self._values[index_name]
+            for item in items:
+                metadata = item["metadata"] or {}
+                fields = {
+                    field: str(metadata[field])
+                    for field in self.fields
+                    if metadata.get(field) is not None
+                }
+                previous = docs.pop(item["id"], None)
+                if previous is None:
+                    self._size += 1
+                else:
+                    self._unlink(index_name, item["id"], previous[1])
+                    if merge:
+                        fields = {**previous[1], **fields}
+
+                self._seq += 1
+                docs[item["id"]] = (self._seq, fields)
+                for field, value in fields.items():
+                    values[field].setdefault(value, set()).add(item["id"])
+
+            if self._size > self.max_ids:
+                log.info(
+                    f"Metadata id index exceeded {self.max_ids} ids, no longer tracking {index_name}"
+                )
+                self._drop(index_name)
+
+    def remove(self, index_name: str, ids: list[str]):
+        with self._lock:
+            docs = self._docs.get(index_name)
+            if docs is None:
+                return
+
+            for id in ids:
+                previous = docs.pop(id, None)
+                if previous is not None:
+                    self._size -= 1
+                    self._unlink(index_name, id, previous[1])
+
+    def lookup(self, index_name: str, filter: dict) -> Optional[list[str]]:
+        # Returns the matching ids in write order, or None when the filter
+        # cannot be answered locally.
+        with self._lock:
+            docs = self._docs.get(index_name)
+            if docs is None or not filter or not filter.keys() <= set(self.fields):
+                return None
+
+            values = self._values[index_name]
+            ids = None
+            for field, value in filter.items():
+                accepted = value if isinstance(value, (list, tuple, set)) else [value]
+                matched = set()
+                for v in accepted:
+                    matched |= values[field].get(str(v), set())
+                ids = matched if ids is None else ids & matched
+            return sorted(ids, key=lambda id: docs[id][0])
+
+
+class SemanticSearchCache:
+    """Per-index LRU cache of search results, hit when a query vector's cosine
+    similarity to a cached query is at least the threshold. Entries expire
+    after a TTL and are dropped whenever their index is written to."""
+
+    def __init__(self, capacity: int, threshold: float, ttl: int):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        # Index name -> [normalized vector, limit, result, expiry], oldest first
+        self._entries: dict[str, list[list]] = {}
+        # Bumped on every invalidation so a search that started before a write
+        # cannot cache its now stale result afterwards. A single counter for all
+        # indices keeps this bounded; a write merely skips unrelated puts.
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _normalize(self, vector) -> Optional[np.ndarray]:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _prune(self, now: float):
+        for index_name in list(self._entries):
+            entries = [entry for entry in self._entries[index_name] if entry[3] > now]
+            if entries:
+                self._entries[index_name] = entries
+            else:
+                del self._entries[index_name]
+
+    def generation(self) -> int:
+        """Token to take before searching and pass to put()."""
+        with self._lock:
+            return self._generation
+
+    def get(self, index_name: str, vector, limit: int) -> Optional[SearchResult]:
+        vector = self._normalize(vector)
+        if vector is None:
+            return None
+
+        with self._lock:
+            now = time.monotonic()
+            entries = [
+                entry
+                for entry in self._entries.get(index_name, [])
+                if entry[3] > now
+                and entry[1] == limit
+                and entry[0].shape == vector.shape
+            ]
+            if not entries:
+                return None
+
+            similarities = np.stack([entry[0] for entry in entries]) @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+
+            # Move the hit to the end so eviction drops least recently used
+            entry = entries[best]
+            self._entries[index_name] = [
+                e for e in self._entries[index_name] if e is not entry
+            ] + [entry]
+            return entry[2].model_copy(deep=True)
+
+    def put(
+        self,
+        index_name: str,
+        vector,
+        limit: int,
+        result: SearchResult,
+        generation: int,
+    ):
+        vector = self._normalize(vector)
+        if vector is None:
+            return
+
+        with self._lock:
+            if generation != self._generation:
+                return
+
+            now = time.monotonic()
+            self._prune(now)
+            entries = self._entries.get(index_name, [])
+            entries.append(
+                [vector, limit, result.model_copy(deep=True), now + self.ttl]
+            )
+            self._entries[index_name] = entries[-self.capacity :]
+
+    def invalidate(self, index_name: Optional[str] = None):
+        with self._lock:
+            if index_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(index_name, None)
+            self._generation += 1
 
 
 class OpenSearchClient(VectorDBBase):
@@ -26,48 +287,120 @@ class OpenSearchClient(VectorDBBase):
             use_ssl=OPENSEARCH_SSL,
             verify_certs=OPENSEARCH_CERT_VERIFY,
             http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
+            serializer=ORJSONSerializer(),
+            http_compress=True,  # gzip request bodies, mostly vector floats
+            connection_class=Urllib3HttpConnection,
+            pool_maxsize=32,  # keep-alive connections shared by bulk threads
+            timeout=30,
+            retry_on_timeout=True,
+            max_retries=3,
+        )
+        # Validated once here rather than on every index creation.
+        self._vector_method = self._get_vector_method()
+        # Index name -> expiry timestamp of indices known to exist, so hot
+        # paths can skip the indices.exists round-trip.
+        self._existing_indices: dict[str, float] = {}
+        self._metadata_index = None
+        if OPENSEARCH_METADATA_CACHE_FIELDS:
+            if UVICORN_WORKERS == 1:
+                self._metadata_index = MetadataIdIndex(
+                    OPENSEARCH_METADATA_CACHE_FIELDS, OPENSEARCH_METADATA_CACHE_MAX_IDS
+                )
+            else:
+                log.warning(
+                    "OPENSEARCH_METADATA_CACHE_FIELDS is ignored with multiple workers, "
+                    "as each worker only sees its own writes."
+                )
+        # Index name -> number of in-flight bulk loads with refresh paused, and
+        # the refresh_interval to restore once the last of them finishes.
+        self._bulk_loads: dict[str, int] = {}
+        self._saved_refresh_intervals: dict[str, Optional[str]] = {}
+        self._bulk_loads_lock = threading.Lock()
+        self._search_cache = (
+            SemanticSearchCache(
+                OPENSEARCH_SEARCH_CACHE_SIZE,
+                OPENSEARCH_SEARCH_CACHE_THRESHOLD,
+                OPENSEARCH_SEARCH_CACHE_TTL,
+            )
+            if OPENSEARCH_SEARCH_CACHE_SIZE > 0
+            else None
+        )
+
+    def _invalidate_search_cache(self, index_name: Optional[str] = None):
+        if self._search_cache:
+            self._search_cache.invalidate(index_name)
+
+    def _mark_index_exists(self, index_name: str):
+        self._existing_indices[index_name] = (
+            time.monotonic() + OPENSEARCH_INDEX_EXISTS_CACHE_TTL
         )
 
     def _get_index_name(self, collection_name: str) -> str:
         return f"{self.index_prefix}_{collection_name}"
 
     def _result_to_get_result(self, result) -> GetResult:
-        if not result["hits"]["hits"]:
+        # filter_path drops the "hits" key entirely when nothing matched.
+        return self._scan_result_to_get_result(result.get("hits", {}).get("hits"))
+
+    def _scan_result_to_get_result(self, hits) -> GetResult:
+        if not hits:
             return None
 
-        ids = []
-        documents = []
-        metadatas = []
+        sources = [hit["_source"] for hit in hits]
 
-        for hit in result["hits"]["hits"]:
-            ids.append(hit["_id"])
-            documents.append(hit["_source"].get("text"))
-            metadatas.append(hit["_source"].get("metadata"))
+        return GetResult(
+            ids=[[hit["_id"] for hit in hits]],
+            documents=[[source.get("text") for source in sources]],
+            metadatas=[[source.get("metadata") for source in sources]],
+        )
 
-        return GetResult(ids=[ids], documents=[documents], metadatas=[metadatas])
+    def _score_to_distance(self, score: float) -> float:
+        # knn innerproduct scores are ip + 1 for ip >= 0 and 1 / (1 - ip)
+        # otherwise. Recover the inner product (the cosine for normalized
+        # embeddings) and map it to [0, 1] like the other backends do.
+        ip = score - 1 if score >= 1 else 1 - 1 / score
+        return min(max((ip + 1) / 2, 0.0), 1.0)
 
     def _result_to_search_result(self, result) -> SearchResult:
-        if not result["hits"]["hits"]:
+        hits = result["hits"]["hits"]
+        if not hits:
             return None
 
-        ids = []
-        distances = []
-        documents = []
-        metadatas = []
-
-        for hit in result["hits"]["hits"]:
-            ids.append(hit["_id"])
-            distances.append(hit["_score"])
-            documents.append(hit["_source"].get("text"))
-            metadatas.append(hit["_source"].get("metadata"))
+        sources = [hit["_source"] for hit in hits]
 
         return SearchResult(
-            ids=[ids],
-            distances=[distances],
-            documents=[documents],
-            metadatas=[metadatas],
+            ids=[[hit["_id"] for hit in hits]],
+            distances=[[self._score_to_distance(hit["_score"]) for hit in hits]],
+            documents=[[source.get("text") for source in sources]],
+            metadatas=[[source.get("metadata") for source in sources]],
         )
 
+    def _get_vector_method(self) -> dict:
+        method = {
+            "name": "hnsw",
+            "space_type": "innerproduct",  # Use inner product to approximate cosine similarity
+            "engine": "faiss",
+            "parameters": {
+                "ef_construction": 128,
+                "m": 16,
+            },
+        }
+        if OPENSEARCH_VECTOR_QUANTIZATION == "fp16":
+            # Faiss stores vectors as 16-bit floats, halving memory and disk.
+            method["parameters"]["encoder"] = {
+                "name": "sq",
+                "parameters": {"type": "fp16"},
+            }
+        elif OPENSEARCH_VECTOR_QUANTIZATION == "int8":
+            # Lucene quantizes vectors to int7/int8 automatically, a 4x saving.
+            method["engine"] = "lucene"
+            method["parameters"]["encoder"] = {"name": "sq"}
+        elif OPENSEARCH_VECTOR_QUANTIZATION:
+            log.warning(
+                f"Unknown OPENSEARCH_VECTOR_QUANTIZATION '{OPENSEARCH_VECTOR_QUANTIZATION}', storing full float vectors."
+            )
+        return method
+
     def _create_index(self, collection_name: str, dimension: int):
         body = {
             "settings": {"index": {"knn": True}},
@@ -78,39 +411,174 @@ class OpenSearchClient(VectorDBBase):
                         "type": "knn_vector",
                         "dimension": dimension,  # Adjust based on your vector dimensions
                         "index": True,
-                        "similarity": "faiss",
-                        "method": {
-                            "name": "hnsw",
-                            "space_type": "innerproduct",  # Use inner product to approximate cosine similarity
-                            "engine": "faiss",
-                            "parameters": {
-                                "ef_construction": 128,
-                                "m": 16,
-                            },
-                        },
+                        "method": self._vector_method,
                     },
                     "text": {"type": "text"},
                     "metadata": {"type": "object"},
                 }
             },
         }
-        self.client.indices.create(
-            index=self._get_index_name(collection_name), body=body
-        )
+        index_name = self._get_index_name(collection_name)
+        # Creating an existing index fails with a 400, which makes this
+        # idempotent in a single round-trip without a prior exists check.
+        response = self.client.indices.create(index=index_name, body=body, ignore=400)
+        error = response.get("error")
+        if error and error.get("type") != "resource_already_exists_exception":
+            raise RuntimeError(
+                f"Failed to create OpenSearch index {index_name}: {error}"
+            )
 
-    def _create_batches(self, items: list[VectorItem], batch_size=100):
-        for i in range(0, len(items), batch_size):
-            yield items[i : i + batch_size]
+        self._mark_index_exists(index_name)
+        if not error and self._metadata_index:
+            self._metadata_index.track(index_name)
+
+    def _track_writes(
+        self,
+        index_name: str,
+        items: list[VectorItem],
+        succeeded: list[str],
+        merge: bool = False,
+    ):
+        if self._metadata_index:
+            ids = set(succeeded)
+            self._metadata_index.add(
+                index_name, [item for item in items if item["id"] in ids], merge
+            )
+
+    def _matches_filter(self, metadata: Optional[dict], filter: dict) -> bool:
+        metadata = metadata or {}
+        for field, value in filter.items():
+            accepted = value if isinstance(value, (list, tuple, set)) else [value]
+            if str(metadata.get(field)) not in {str(v) for v in accepted}:
+                return False
+        return True
+
+    @contextmanager
+    def _refresh_disabled(self, index_name: str, item_count: int):
+        # Periodic refreshes create a new segment every second, which throttles
+        # large bulk loads. Pause them for the duration and restore afterwards.
+        # Concurrent loads into the same index share one pause: the first saves
+        # the original interval and the last one out restores it. The lock only
+        # guards that bookkeeping; the settings requests are made outside it.
+        if item_count < BULK_REFRESH_DISABLE_THRESHOLD:
+            yield
+            return
+
+        with self._bulk_loads_lock:
+            self._bulk_loads[index_name] = self._bulk_loads.get(index_name, 0) + 1
+            first = self._bulk_loads[index_name] == 1
+
+        try:
+            if first:
+                settings = self.client.indices.get_settings(
+                    index=index_name, name="index.refresh_interval"
+                )
+                refresh_interval = (
+                    settings.get(index_name, {})
+                    .get("settings", {})
+                    .get("index", {})
+                    .get("refresh_interval")
+                )
+                # A "-1" is a pause left behind by another worker or a failed
+                # restore, never the original value; None resets the setting to
+                # the cluster default.
+                if str(refresh_interval) == "-1":
+                    refresh_interval = None
+                with self._bulk_loads_lock:
+                    self._saved_refresh_intervals[index_name] = refresh_interval
+                self.client.indices.put_settings(
+                    index=index_name, body={"index": {"refresh_interval": "-1"}}
+                )
+            yield
+        finally:
+            with self._bulk_loads_lock:
+                self._bulk_loads[index_name] -= 1
+                last = not self._bulk_loads[index_name]
+                if last:
+                    del self._bulk_loads[index_name]
+                    restore = index_name in self._saved_refresh_intervals
+                    refresh_interval = self._saved_refresh_intervals.pop(
+                        index_name, None
+                    )
+            if last and restore:
+                self.client.indices.put_settings(
+                    index=index_name,
+                    body={"index": {"refresh_interval": refresh_interval}},
+                )
+
+    def _bulk(self, index_name: str, actions, count: int, succeeded: list[str]):
+        # Every chunk is sent even if some actions fail; the ids that made it
+        # are appended to succeeded and a BulkIndexError is raised at the end.
+        options = {
+            "chunk_size": OPENSEARCH_BULK_CHUNK_SIZE,
+            "max_chunk_bytes": OPENSEARCH_BULK_MAX_BYTES,
+            "raise_on_error": False,
+            # Sent once as the request's default index instead of per action.
+            "index": index_name,
+        }
+        if count > OPENSEARCH_BULK_CHUNK_SIZE:
+            # parallel_bulk keeps several bulk requests in flight at once,
+            # overlapping the HTTP round-trips of the chunks.
+            results = parallel_bulk(self.client, actions, thread_count=4, **options)
+        else:
+            # A single chunk gains nothing from spinning up a thread pool.
+            results = streaming_bulk(self.client, actions, **options)
+
+        errors = []
+        for ok, info in results:
+            op_type, result = next(iter(info.items()))
+            # Deleting an already missing document is not a failure.
+            if ok or (op_type == "delete" and result.get("status") == 404):
+                succeeded.append(result.get("_id"))
+            else:
+                errors.append(info)
+
+        # Log once per call rather than once per failed action, which could
+        # mean thousands of synchronous writes when a whole batch is rejected.
+        if errors:
+            log.error(
+                f"OpenSearch bulk request had {len(errors)} failed actions, first: {errors[0]}"
+            )
+            raise BulkIndexError(f"{len(errors)} document(s) failed to index.", errors)
+
+    def _build_filter_clauses(self, filter: dict) -> list[dict]:
+        # Multiple accepted values for a field collapse into a single terms clause.
+        return [
+            (
+                {"terms": {"metadata." + str(field) + ".keyword": list(value)}}
+                if isinstance(value, (list, tuple, set))
+                else {"term": {"metadata." + str(field) + ".keyword": value}}
+            )
+            for field, value in filter.items()
+        ]
+
+    def _is_index_cached(self, index_name: str) -> bool:
+        expires_at = self._existing_indices.get(index_name)
+        return expires_at is not None and expires_at > time.monotonic()
 
     def has_collection(self, collection_name: str) -> bool:
         # has_collection here means has index.
         # We are simply adapting to the norms of the other DBs.
-        return self.client.indices.exists(index=self._get_index_name(collection_name))
+        index_name = self._get_index_name(collection_name)
+        if self._is_index_cached(index_name):
+            return True
+
+        exists = self.client.indices.exists(index=index_name)
+        if exists:
+            self._mark_index_exists(index_name)
+        else:
+            self._existing_indices.pop(index_name, None)
+        return exists
 
     def delete_collection(self, collection_name: str):
         # delete_collection here means delete index.
         # We are simply adapting to the norms of the other DBs.
-        self.client.indices.delete(index=self._get_index_name(collection_name))
+        index_name = self._get_index_name(collection_name)
+        self._existing_indices.pop(index_name, None)
+        if self._metadata_index:
+            self._metadata_index.drop(index_name)
+        self._invalidate_search_cache(index_name)
+        self.client.indices.delete(index=index_name)
 
     def search(
         self, collection_name: str, vectors: list[list[float | int]], limit: int
@@ -119,28 +587,35 @@ class OpenSearchClient(VectorDBBase):
             if not self.has_collection(collection_name):
                 return None
 
+            index_name = self._get_index_name(collection_name)
+            if self._search_cache:
+                cached = self._search_cache.get(index_name, vectors[0], limit)
+                if cached is not None:
+                    return cached
+                generation = self._search_cache.generation()
+
             query = {
                 "size": limit,
-                "_source": ["text", "metadata"],
+                "_source": SOURCE_FIELDS,
                 "query": {
-                    "script_score": {
-                        "query": {"match_all": {}},
-                        "script": {
-                            "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
-                            "params": {
-                                "field": "vector",
-                                "query_value": vectors[0],
-                            },  # Assuming single query vector
-                        },
+                    "knn": {
+                        "vector": {
+                            # Assuming single query vector
+                            "vector": np.asarray(vectors[0], dtype=np.float32),
+                            "k": limit,
+                        }
                     }
                 },
             }
 
-            result = self.client.search(
-                index=self._get_index_name(collection_name), body=query
+            result = self._result_to_search_result(
+                self.client.search(index=index_name, body=query)
             )
-
-            return self._result_to_search_result(result)
+            if self._search_cache and result is not None:
+                self._search_cache.put(
+                    index_name, vectors[0], limit, result, generation
+                )
+            return result
 
         except Exception as e:
             return None
@@ -152,22 +627,45 @@ class OpenSearchClient(VectorDBBase):
             return None
 
         query_body = {
-            "query": {"bool": {"filter": []}},
-            "_source": ["text", "metadata"],
+            "query": {"bool": {"filter": self._build_filter_clauses(filter)}},
+            "_source": SOURCE_FIELDS,
         }
 
-        for field, value in filter.items():
-            query_body["query"]["bool"]["filter"].append(
-                {"term": {"metadata." + str(field) + ".keyword": value}}
-            )
-
         size = limit if limit else 10000
 
+        index_name = self._get_index_name(collection_name)
+        ids = (
+            self._metadata_index.lookup(index_name, filter)
+            if self._metadata_index
+            else None
+        )
+        if ids is not None:
+            if not ids:
+                return None
+            try:
+                result = self.client.mget(
+                    index=index_name,
+                    body={"ids": ids[:size]},
+                    _source=SOURCE_FIELDS,
+                )
+                # The local index may lag behind failed writes; re-check the
+                # filter against the stored documents.
+                docs = [
+                    doc
+                    for doc in result["docs"]
+                    if doc.get("found")
+                    and self._matches_filter(doc["_source"].get("metadata"), filter)
+                ]
+                return self._scan_result_to_get_result(docs)
+            except Exception as e:
+                return None
+
         try:
             result = self.client.search(
-                index=self._get_index_name(collection_name),
+                index=index_name,
                 body=query_body,
                 size=size,
+                filter_path="hits.hits._id,hits.hits._source.text,hits.hits._source.metadata",
             )
 
             return self._result_to_get_result(result)
@@ -175,62 +673,79 @@ class OpenSearchClient(VectorDBBase):
         except Exception as e:
             return None
 
-    def _create_index_if_not_exists(self, collection_name: str, dimension: int):
-        if not self.has_collection(collection_name):
-            self._create_index(collection_name, dimension)
-
     def get(self, collection_name: str) -> Optional[GetResult]:
-        query = {"query": {"match_all": {}}, "_source": ["text", "metadata"]}
+        query = {"query": {"match_all": {}}, "_source": SOURCE_FIELDS}
 
-        result = self.client.search(
-            index=self._get_index_name(collection_name), body=query
+        # Scroll through the whole index; a plain search only returns 10 hits.
+        hits = list(
+            scan(
+                self.client,
+                index=self._get_index_name(collection_name),
+                query=query,
+                size=1000,
+                scroll="2m",
+            )
         )
-        return self._result_to_get_result(result)
+        return self._scan_result_to_get_result(hits)
 
-    def insert(self, collection_name: str, items: list[VectorItem]):
-        self._create_index_if_not_exists(
+    def _write(
+        self,
+        collection_name: str,
+        items: list[VectorItem],
+        build_action: Callable[[VectorItem], dict],
+        merge: bool = False,
+    ):
+        # Always (idempotently) create the index on writes rather than trusting
+        # the exists cache: if another worker deleted it, a bulk write would
+        # auto-create it with a dynamic mapping that lacks the knn_vector field.
+        self._create_index(
             collection_name=collection_name, dimension=len(items[0]["vector"])
         )
 
-        for batch in self._create_batches(items):
-            actions = [
-                {
-                    "_op_type": "index",
-                    "_index": self._get_index_name(collection_name),
-                    "_id": item["id"],
-                    "_source": {
-                        "vector": item["vector"],
-                        "text": item["text"],
-                        "metadata": stringify_metadata(item["metadata"]),
-                    },
-                }
-                for item in batch
-            ]
-            bulk(self.client, actions)
-        self.client.indices.refresh(self._get_index_name(collection_name))
+        index_name = self._get_index_name(collection_name)
+        actions = (build_action(item) for item in items)
+        succeeded = []
+        try:
+            with self._refresh_disabled(index_name, len(items)):
+                self._bulk(index_name, actions, len(items), succeeded)
+        finally:
+            # Even on failure some documents may have been written.
+            self.client.indices.refresh(index_name)
+            self._track_writes(index_name, items, succeeded, merge)
+            self._invalidate_search_cache(index_name)
 
-    def upsert(self, collection_name: str, items: list[VectorItem]):
-        self._create_index_if_not_exists(
-            collection_name=collection_name, dimension=len(items[0]["vector"])
+    def insert(self, collection_name: str, items: list[VectorItem]):
+        self._write(
+            collection_name,
+            items,
+            lambda item: {
+                "_op_type": "index",
+                "_id": item["id"],
+                "_source": {
+                    "vector": np.asarray(item["vector"], dtype=np.float32),
+                    "text": item["text"],
+                    "metadata": stringify_metadata(item["metadata"]),
+                },
+            },
         )
 
-        for batch in self._create_batches(items):
-            actions = [
-                {
-                    "_op_type": "update",
-                    "_index": self._get_index_name(collection_name),
-                    "_id": item["id"],
-                    "doc": {
-                        "vector": item["vector"],
-                        "text": item["text"],
-                        "metadata": stringify_metadata(item["metadata"]),
-                    },
-                    "doc_as_upsert": True,
-                }
-                for item in batch
-            ]
-            bulk(self.client, actions)
-        self.client.indices.refresh(self._get_index_name(collection_name))
+    def upsert(self, collection_name: str, items: list[VectorItem]):
+        # Partial updates merge metadata with the stored document.
+        self._write(
+            collection_name,
+            items,
+            lambda item: {
+                "_op_type": "update",
+                "_id": item["id"],
+                "doc": {
+                    "vector": np.asarray(item["vector"], dtype=np.float32),
+                    "text": item["text"],
+                    "metadata": stringify_metadata(item["metadata"]),
+                },
+                "doc_as_upsert": True,
+            },
+            merge=True,
+        )
 
     def delete(
         self,
@@ -238,30 +753,78 @@ class OpenSearchClient(VectorDBBase):
         ids: Optional[list[str]] = None,
         filter: Optional[dict] = None,
     ):
-        if ids:
-            actions = [
-                {
-                    "_op_type": "delete",
-                    "_index": self._get_index_name(collection_name),
-                    "_id": id,
+        index_name = self._get_index_name(collection_name)
+        try:
+            # delete_by_query only sees refreshed documents, so while a bulk load
+            # has refresh paused on this index, delete by id instead.
+            if (
+                ids
+                and len(ids) >= DELETE_BY_QUERY_THRESHOLD
+                and index_name not in self._bulk_loads
+            ):
+                deleted = 0
+                try:
+                    for i in range(0, len(ids), DELETE_BY_QUERY_CHUNK_SIZE):
+                        self.client.delete_by_query(
+                            index=index_name,
+                            body={
+                                "query": {
+                                    "terms": {
+                                        "_id": ids[i : i + DELETE_BY_QUERY_CHUNK_SIZE]
+                                    }
+                                }
+                            },
+                            conflicts="proceed",
+                            refresh=False,
+                            wait_for_completion=True,
+                        )
+                        deleted = i + DELETE_BY_QUERY_CHUNK_SIZE
+                finally:
+                    if self._metadata_index:
+                        self._metadata_index.remove(index_name, ids[:deleted])
+            elif ids:
+                actions = [
+                    {
+                        "_op_type": "delete",
+                        "_id": id,
+                    }
+                    for id in ids
+                ]
+                succeeded = []
+                try:
+                    self._bulk(index_name, actions, len(actions), succeeded)
+                finally:
+                    if self._metadata_index:
+                        self._metadata_index.remove(index_name, succeeded)
+            elif filter:
+                query_body = {
+                    "query": {"bool": {"filter": self._build_filter_clauses(filter)}},
                 }
-                for id in ids
-            ]
-            bulk(self.client, actions)
-        elif filter:
-            query_body = {
-                "query": {"bool": {"filter": []}},
-            }
-            for field, value in filter.items():
-                query_body["query"]["bool"]["filter"].append(
-                    {"term": {"metadata." + str(field) + ".keyword": value}}
-                )
-            self.client.delete_by_query(
-                index=self._get_index_name(collection_name), body=query_body
-            )
-        self.client.indices.refresh(self._get_index_name(collection_name))
+                self.client.delete_by_query(index=index_name, body=query_body)
+                # The deleted ids are unknown, so stop answering from the local index.
+                if self._metadata_index:
+                    self._metadata_index.drop(index_name)
+        finally:
+            # Even on failure some documents may have been deleted.
+            self.client.indices.refresh(index_name)
+            self._invalidate_search_cache(index_name)
 
     def reset(self):
+        self._existing_indices.clear()
+        if self._metadata_index:
+            self._metadata_index.drop()
+        self._invalidate_search_cache()
         indices = self.client.indices.get(index=f"{self.index_prefix}_*")
+        # Delete several indices per request, keeping each comma-separated list
+        # well under OpenSearch's 4KB limit on the HTTP request line.
+        batch = []
+        length = 0
         for index in indices:
-            self.client.indices.delete(index=index)
+            if batch and length + len(index) > RESET_DELETE_MAX_PATH_LENGTH:
+                self.client.indices.delete(index=",".join(batch))
+                batch = []
+                length = 0
+            batch.append(index)
+            length += len(index) + 1
+        if batch:
+            self.client.indices.delete(index=",".join(batch))
@@ -0,0 +1,589 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from opensearchpy.exceptions import SerializationError
+from opensearchpy.helpers import BulkIndexError
+from open_webui.retrieval.vector.dbs.opensearch import (
+    BULK_REFRESH_DISABLE_THRESHOLD,
+    DELETE_BY_QUERY_CHUNK_SIZE,
+    DELETE_BY_QUERY_THRESHOLD,
+    OPENSEARCH_BULK_CHUNK_SIZE,
+    RESET_DELETE_MAX_PATH_LENGTH,
+    MetadataIdIndex,
+    OpenSearchClient,
+    ORJSONSerializer,
+    SemanticSearchCache,
+)
+from open_webui.retrieval.vector.main import SearchResult
+
+
+def make_items(*ids, **metadata):
+    return [
+        {"id": id, "text": f"text {id}", "vector": [0.1, 0.2], "metadata": metadata}
+        for id in ids
+    ]
+
+
+@pytest.fixture
+def client():
+    with patch("open_webui.retrieval.vector.dbs.opensearch.OpenSearch"):
+        client = OpenSearchClient()
+    client.client.indices.create.return_value = {"acknowledged": True}
+    return client
+
+
+class TestOpenSearchBulk:
+    """Test bulk write error handling"""
+
+    @patch("open_webui.retrieval.vector.dbs.opensearch.streaming_bulk")
+    def test_insert_raises_after_draining_all_chunks(self, mock_streaming_bulk, client):
+        """A failed document fails the insert, but only once every chunk is sent"""
+        mock_streaming_bulk.return_value = iter(
+            [
+                (True, {"index": {"_id": "a", "status": 201}}),
+                (
+                    False,
+                    {
+                        "index": {
+                            "_id": "b",
+                            "status": 400,
+                            "error": {"type": "mapper_parsing_exception"},
+                        }
+                    },
+                ),
+                (True, {"index": {"_id": "c", "status": 201}}),
+            ]
+        )
+
+        with pytest.raises(BulkIndexError) as exc_info:
+            client.insert("test", make_items("a", "b", "c"))
+
+        assert len(exc_info.value.errors) == 1
+        client.client.indices.refresh.assert_called_once_with("open_webui_test")
+
+    @patch("open_webui.retrieval.vector.dbs.opensearch.streaming_bulk")
+    def test_insert_succeeds_without_errors(self, mock_streaming_bulk, client):
+        """A fully successful bulk write returns normally"""
+        mock_streaming_bulk.return_value = iter(
+            [(True, {"index": {"_id": "a", "status": 201}})]
+        )
+
+        client.insert("test", make_items("a"))
+
+        client.client.indices.refresh.assert_called_once_with("open_webui_test")
+
+    @patch("open_webui.retrieval.vector.dbs.opensearch.streaming_bulk")
+    def test_delete_of_missing_document_is_not_an_error(
+        self, mock_streaming_bulk, client
+    ):
+        """Deleting an id that is already gone is treated as success"""
+        mock_streaming_bulk.return_value = iter(
+            [(False, {"delete": {"_id": "a", "status": 404, "result": "not_found"}})]
+        )
+
+        client.delete("test", ids=["a"])
+
+    @patch("open_webui.retrieval.vector.dbs.opensearch.streaming_bulk")
+    @patch("open_webui.retrieval.vector.dbs.opensearch.parallel_bulk")
+    def test_thread_pool_only_for_multiple_chunks(
+        self, mock_parallel_bulk, mock_streaming_bulk, client
+    ):
+        """parallel_bulk is only used once the actions span several chunks"""
+        mock_parallel_bulk.side_effect = lambda *args, **kwargs: iter([])
+        mock_streaming_bulk.side_effect = lambda *args, **kwargs: iter([])
+
+        client.insert("test", make_items(*map(str, range(OPENSEARCH_BULK_CHUNK_SIZE))))
+        mock_streaming_bulk.assert_called_once()
+        mock_parallel_bulk.assert_not_called()
+
+        mock_streaming_bulk.reset_mock()
+        client.insert(
+            "test", make_items(*map(str, range(OPENSEARCH_BULK_CHUNK_SIZE + 1)))
+        )
+        mock_parallel_bulk.assert_called_once()
+        mock_streaming_bulk.assert_not_called()
+
+
+class TestOpenSearchDelete:
+    """Test deleting documents by id"""
+
+    @patch("open_webui.retrieval.vector.dbs.opensearch.streaming_bulk")
+    def test_few_ids_use_bulk_deletes(self, mock_streaming_bulk, client):
+        """Below the threshold ids are deleted with bulk delete actions"""
+        mock_streaming_bulk.side_effect = lambda *args, **kwargs: iter([])
+
+        client.delete(
+            "test", ids=[str(i) for i in range(DELETE_BY_QUERY_THRESHOLD - 1)]
+        )
+
+        mock_streaming_bulk.assert_called_once()
+        client.client.delete_by_query.assert_not_called()
+
+    def test_many_ids_use_chunked_delete_by_query(self, client):
+        """At the threshold ids are deleted by query, a chunk at a time"""
+        ids = [str(i) for i in range(DELETE_BY_QUERY_CHUNK_SIZE + 1)]
+
+        client.delete("test", ids=ids)
+
+        chunks = [
+            call.kwargs["body"]["query"]["terms"]["_id"]
+            for call in client.client.delete_by_query.call_args_list
+        ]
+        assert chunks == [ids[:DELETE_BY_QUERY_CHUNK_SIZE], ids[-1:]]
+        client.client.indices.refresh.assert_called_once_with("open_webui_test")
+
+    @patch("open_webui.retrieval.vector.dbs.opensearch.streaming_bulk")
+    def test_bulk_deletes_while_refresh_is_paused(self, mock_streaming_bulk, client):
+        """delete_by_query is skipped while a bulk load has refresh paused"""
+        mock_streaming_bulk.side_effect = lambda *args, **kwargs: iter([])
+        client._bulk_loads["open_webui_test"] = 1
+
+        client.delete("test", ids=[str(i) for i in range(DELETE_BY_QUERY_THRESHOLD)])
+
+        mock_streaming_bulk.assert_called_once()
+        client.client.delete_by_query.assert_not_called()
+
+    def test_failed_chunk_still_updates_caches(self, client):
+        """Chunks deleted before a failure are forgotten and the cache cleared"""
+        ids = [str(i) for i in range(DELETE_BY_QUERY_CHUNK_SIZE + 1)]
+        client.client.delete_by_query.side_effect = [{}, ConnectionError()]
+        client._metadata_index = MagicMock()
+        client._search_cache = MagicMock()
+
+        with pytest.raises(ConnectionError):
+            client.delete("test", ids=ids)
+
+        client._metadata_index.remove.assert_called_once_with(
+            "open_webui_test", ids[:DELETE_BY_QUERY_CHUNK_SIZE]
+        )
+        client._search_cache.invalidate.assert_called_once_with("open_webui_test")
+
+
+class TestORJSONSerializer:
+    """Test the orjson-backed request serializer"""
+
+    def test_dumps_numpy_and_non_string_keys(self):
+        """Vectors and non-string keys serialize like the stdlib serializer"""
+        data = {"vector": np.asarray([0.5, 1.0], dtype=np.float32), 1: "a"}
+
+        assert ORJSONSerializer().dumps(data) == '{"vector":[0.5,1.0],"1":"a"}'
+
+    def test_strings_pass_through(self):
+        """Pre-serialized bodies are sent unchanged"""
+        assert ORJSONSerializer().dumps('{"a":1}') == '{"a":1}'
+
+    def test_failures_raise_serialization_error(self):
+        """Unserializable data raises the client's SerializationError"""
+        with pytest.raises(SerializationError):
+            ORJSONSerializer().dumps({"a": object()})
+
+
+class TestOpenSearchSearchScores:
+    """Test knn score normalization"""
+
+    @pytest.mark.parametrize(
+        "score, expected",
+        [
+            (2.0, 1.0),  # cos = 1
+            (1.5, 0.75),  # cos = 0.5
+            (1.0, 0.5),  # cos = 0
+            (2 / 3, 0.25),  # cos = -0.5
+            (0.5, 0.0),  # cos = -1
+        ],
+    )
+    def test_score_maps_to_cosine_range(self, client, score, expected):
+        """Scores map to (cos + 1) / 2 like the other backends"""
+        assert client._score_to_distance(score) == pytest.approx(expected)
+
+    def test_search_returns_normalized_distances(self, client):
+        """search() reports normalized distances in result order"""
+        client.client.indices.exists.return_value = True
+        client.client.search.return_value = {
+            "hits": {
+                "hits": [
+                    {"_id": "a", "_score": 1.8, "_source": {"text": "a"}},
+                    {"_id": "b", "_score": 1.2, "_source": {"text": "b"}},
+                ]
+            }
+        }
+
+        result = client.search("test", [[0.1, 0.2]], 2)
+
+        assert result.ids == [["a", "b"]]
+        assert result.distances[0] == pytest.approx([0.9, 0.6])
+
+
+class TestOpenSearchIndexCreation:
+    """Test index creation on the write path"""
+
+    @patch("open_webui.retrieval.vector.dbs.opensearch.streaming_bulk")
+    def test_insert_creates_index_even_when_cached(self, mock_streaming_bulk, client):
+        """Writes do not trust the exists cache, which reads still use"""
+        mock_streaming_bulk.side_effect = lambda *args, **kwargs: iter([])
+        client.client.indices.exists.return_value = True
+        assert client.has_collection("test")
+
+        client.insert("test", make_items("a"))
+        client.insert("test", make_items("b"))
+
+        assert client.client.indices.create.call_count == 2
+        assert client.has_collection("test")
+        client.client.indices.exists.assert_called_once()
+
+    @patch(
+        "open_webui.retrieval.vector.dbs.opensearch.OPENSEARCH_VECTOR_QUANTIZATION",
+        "bogus",
+    )
+    @patch("open_webui.retrieval.vector.dbs.opensearch.log")
+    @patch("open_webui.retrieval.vector.dbs.opensearch.OpenSearch")
+    def test_unknown_quantization_warns_once(self, mock_opensearch, mock_log):
+        """The quantization setting is validated once, not on every write"""
+        client = OpenSearchClient()
+        client.client.indices.create.return_value = {"acknowledged": True}
+
+        client._create_index("a", 2)
+        client._create_index("b", 2)
+
+        mock_log.warning.assert_called_once()
+        body = client.client.indices.create.call_args.kwargs["body"]
+        assert (
+            "encoder"
+            not in body["mappings"]["properties"]["vector"]["method"]["parameters"]
+        )
+
+    def test_existing_index_is_not_an_error(self, client):
+        """An already existing index counts as created"""
+        client.client.indices.create.return_value = {
+            "error": {"type": "resource_already_exists_exception"},
+            "status": 400,
+        }
+
+        client._create_index("test", 2)
+
+        assert client.has_collection("test")
+        client.client.indices.exists.assert_not_called()
+
+    def test_other_create_errors_are_raised(self, client):
+        """Any other 400 from index creation is raised"""
+        client.client.indices.create.return_value = {
+            "error": {"type": "mapper_parsing_exception"},
+            "status": 400,
+        }
+
+        with pytest.raises(RuntimeError):
+            client._create_index("test", 2)
+
+
+class TestOpenSearchRefreshInterval:
+    """Test pausing index refresh during large bulk loads"""
+
+    def test_small_loads_leave_refresh_alone(self, client):
+        """Loads below the threshold do not touch index settings"""
+        with client._refresh_disabled("idx", BULK_REFRESH_DISABLE_THRESHOLD - 1):
+            pass
+
+        client.client.indices.put_settings.assert_not_called()
+
+    def test_overlapping_loads_restore_original_interval(self, client):
+        """Only the first load saves the interval and only the last restores it"""
+        client.client.indices.get_settings.return_value = {
+            "idx": {"settings": {"index": {"refresh_interval": "5s"}}}
+        }
+        put_settings = client.client.indices.put_settings
+
+        with client._refresh_disabled("idx", BULK_REFRESH_DISABLE_THRESHOLD):
+            with client._refresh_disabled("idx", BULK_REFRESH_DISABLE_THRESHOLD):
+                pass
+            assert put_settings.call_count == 1
+
+        client.client.indices.get_settings.assert_called_once()
+        assert [call.kwargs["body"] for call in put_settings.call_args_list] == [
+            {"index": {"refresh_interval": "-1"}},
+            {"index": {"refresh_interval": "5s"}},
+        ]
+
+    def test_interval_restored_when_load_fails(self, client):
+        """A failing load still restores the interval"""
+        client.client.indices.get_settings.return_value = {}
+
+        with pytest.raises(ValueError):
+            with client._refresh_disabled("idx", BULK_REFRESH_DISABLE_THRESHOLD):
+                raise ValueError()
+
+        assert client.client.indices.put_settings.call_args.kwargs["body"] == {
+            "index": {"refresh_interval": None}
+        }
+
+    def test_leftover_pause_is_not_saved(self, client):
+        """A "-1" left behind by another loader restores the cluster default"""
+        client.client.indices.get_settings.return_value = {
+            "idx": {"settings": {"index": {"refresh_interval": "-1"}}}
+        }
+
+        with client._refresh_disabled("idx", BULK_REFRESH_DISABLE_THRESHOLD):
+            pass
+
+        assert client.client.indices.put_settings.call_args.kwargs["body"] == {
+            "index": {"refresh_interval": None}
+        }
+
+    def test_failed_get_settings_leaves_interval_alone(self, client):
+        """Nothing is restored if the interval was never paused"""
+        client.client.indices.get_settings.side_effect = ConnectionError()
+
+        with pytest.raises(ConnectionError):
+            with client._refresh_disabled("idx", BULK_REFRESH_DISABLE_THRESHOLD):
+                pass
+
+        client.client.indices.put_settings.assert_not_called()
+        assert client._bulk_loads == {}
+
+
+class TestMetadataIdIndex:
+    """Test the in-process metadata id index"""
+
+    @pytest.fixture
+    def index(self):
+        index = MetadataIdIndex(["file_id", "page"], max_ids=100)
+        index.track("idx")
+        return index
+
+    def test_untracked_index_is_not_answered(self, index):
+        """Indices not created by this process fall back to a search"""
+        assert index.lookup("other", {"file_id": "f1"}) is None
+
+    def test_unindexed_field_is_not_answered(self, index):
+        """Filters on fields outside the configured list fall back to a search"""
+        index.add("idx", make_items("a", file_id="f1"))
+
+        assert index.lookup("idx", {"source": "x"}) is None
+        assert index.lookup("idx", {"file_id": "f1", "source": "x"}) is None
+        assert index.lookup("idx", {}) is None
+
+    def test_lookup_intersects_fields_in_write_order(self, index):
+        """Multi-field filters intersect, returned in write order"""
+        index.add("idx", make_items("c", "a", file_id="f1", page=1))
+        index.add("idx", make_items("b", file_id="f1", page=2))
+
+        assert index.lookup("idx", {"file_id": "f1"}) == ["c", "a", "b"]
+        assert index.lookup("idx", {"file_id": "f1", "page": 1}) == ["c", "a"]
+        assert index.lookup("idx", {"file_id": "f2"}) == []
+
+    def test_values_are_keyed_by_string(self, index):
+        """1 and "1" match each other, as the keyword term filter does"""
+        index.add("idx", make_items("a", page=1))
+
+        assert index.lookup("idx", {"page": "1"}) == ["a"]
+        assert index.lookup("idx", {"page": 1}) == ["a"]
+        assert index.lookup("idx", {"page": [1, 2]}) == ["a"]
+
+    def test_remove_forgets_ids(self, index):
+        """Removed ids no longer match"""
+        index.add("idx", make_items("a", "b", file_id="f1"))
+        index.remove("idx", ["a", "missing"])
+
+        assert index.lookup("idx", {"file_id": "f1"}) == ["b"]
+
+    def test_insert_replaces_metadata(self, index):
+        """A full index write replaces all tracked fields"""
+        index.add("idx", make_items("a", file_id="f1", page=1))
+        index.add("idx", make_items("a", file_id="f2"))
+
+        assert index.lookup("idx", {"file_id": "f1"}) == []
+        assert index.lookup("idx", {"file_id": "f2"}) == ["a"]
+        assert index.lookup("idx", {"page": 1}) == []
+
+    def test_upsert_merges_metadata(self, index):
+        """A partial update keeps fields missing from the new metadata"""
+        index.add("idx", make_items("a", file_id="f1", page=1))
+        index.add("idx", make_items("a", file_id="f2"), merge=True)
+
+        assert index.lookup("idx", {"file_id": "f2"}) == ["a"]
+        assert index.lookup("idx", {"page": 1}) == ["a"]
+
+    def test_overflow_stops_tracking_index(self):
+        """Exceeding max_ids drops the index rather than growing without bound"""
+        index = MetadataIdIndex(["file_id"], max_ids=2)
+        index.track("idx")
+        index.add("idx", make_items("a", "b", file_id="f1"))
+        assert index.lookup("idx", {"file_id": "f1"}) == ["a", "b"]
+
+        index.add("idx", make_items("c", file_id="f1"))
+
+        assert index.lookup("idx", {"file_id": "f1"}) is None
+        assert index._size == 0
+
+    def test_drop(self, index):
+        """Dropped indices are no longer answered"""
+        index.add("idx", make_items("a", file_id="f1"))
+        index.drop("idx")
+
+        assert index.lookup("idx", {"file_id": "f1"}) is None
+
+
+class TestOpenSearchMetadataQuery:
+    """Test answering query() from the metadata id index"""
+
+    def test_query_uses_mget_for_tracked_fields(self, client):
+        """Equality filters on tracked fields are fetched with mget and re-checked"""
+        client._metadata_index = MetadataIdIndex(["file_id"], max_ids=100)
+        client._metadata_index.track("open_webui_test")
+        client._metadata_index.add(
+            "open_webui_test", make_items("a", "b", file_id="f1")
+        )
+        client.client.indices.exists.return_value = True
+        client.client.mget.return_value = {
+            "docs": [
+                {
+                    "_id": "a",
+                    "found": True,
+                    "_source": {"text": "a", "metadata": {"file_id": "f1"}},
+                },
+                {
+                    "_id": "b",
+                    "found": True,
+                    "_source": {"text": "b", "metadata": {"file_id": "f2"}},
+                },
+            ]
+        }
+
+        result = client.query("test", {"file_id": "f1"})
+
+        assert result.ids == [["a"]]
+        assert client.client.mget.call_args.kwargs["body"] == {"ids": ["a", "b"]}
+        client.client.search.assert_not_called()
+
+
+class TestOpenSearchReset:
+    """Test deleting all indices"""
+
+    def test_reset_deletes_indices_in_bounded_batches(self, client):
+        """Index lists are split so no request line grows past the limit"""
+        indices = [f"open_webui_file-{i:036d}" for i in range(200)]
+        client.client.indices.get.return_value = {index: {} for index in indices}
+
+        client.reset()
+
+        batches = [
+            call.kwargs["index"] for call in client.client.indices.delete.call_args_list
+        ]
+        assert len(batches) > 1
+        assert all(len(batch) <= RESET_DELETE_MAX_PATH_LENGTH for batch in batches)
+        assert [index for batch in batches for index in batch.split(",")] == indices
+
+    def test_reset_without_indices(self, client):
+        """Nothing is deleted when there are no indices"""
+        client.client.indices.get.return_value = {}
+
+        client.reset()
+
+        client.client.indices.delete.assert_not_called()
+
+
+def make_result(id):
+    return SearchResult(
+        ids=[[id]], distances=[[1.0]], documents=[[id]], metadatas=[[{}]]
+    )
+
+
+class TestSemanticSearchCache:
+    """Test the semantic search result cache"""
+
+    @pytest.fixture
+    def cache(self):
+        return SemanticSearchCache(capacity=2, threshold=0.98, ttl=60)
+
+    def put(self, cache, vector, result, index_name="idx", limit=5):
+        cache.put(index_name, vector, limit, result, cache.generation())
+
+    def test_similar_query_hits(self, cache):
+        """Queries above the similarity threshold return the cached result"""
+        self.put(cache, [1.0, 0.0], make_result("a"))
+
+        assert cache.get("idx", [2.0, 0.01], 5).ids == [["a"]]
+
+    def test_dissimilar_query_misses(self, cache):
+        """Queries below the similarity threshold miss"""
+        self.put(cache, [1.0, 0.0], make_result("a"))
+
+        assert cache.get("idx", [1.0, 0.5], 5) is None
+        assert cache.get("other", [1.0, 0.0], 5) is None
+
+    def test_limit_must_match(self, cache):
+        """A result cached for one limit is not reused for another"""
+        self.put(cache, [1.0, 0.0], make_result("a"), limit=5)
+
+        assert cache.get("idx", [1.0, 0.0], 10) is None
+
+    def test_evicts_least_recently_used(self, cache):
+        """A hit refreshes an entry's position, so the other one is evicted"""
+        self.put(cache, [1.0, 0.0], make_result("a"))
+        self.put(cache, [0.0, 1.0], make_result("b"))
+        assert cache.get("idx", [1.0, 0.0], 5) is not None
+
+        self.put(cache, [-1.0, 0.0], make_result("c"))
+
+        assert cache.get("idx", [1.0, 0.0], 5).ids == [["a"]]
+        assert cache.get("idx", [0.0, 1.0], 5) is None
+        assert cache.get("idx", [-1.0, 0.0], 5).ids == [["c"]]
+
+    @patch("open_webui.retrieval.vector.dbs.opensearch.time.monotonic")
+    def test_entries_expire(self, mock_monotonic, cache):
+        """Entries expire after the TTL and are pruned from idle indices"""
+        mock_monotonic.return_value = 100.0
+        self.put(cache, [1.0, 0.0], make_result("a"))
+
+        mock_monotonic.return_value = 159.0
+        assert cache.get("idx", [1.0, 0.0], 5) is not None
+
+        mock_monotonic.return_value = 161.0
+        assert cache.get("idx", [1.0, 0.0], 5) is None
+
+        self.put(cache, [1.0, 0.0], make_result("b"), index_name="other")
+        assert "idx" not in cache._entries
+
+    def test_invalidate_index(self, cache):
+        """Invalidating an index drops only its entries"""
+        self.put(cache, [1.0, 0.0], make_result("a"))
+        self.put(cache, [1.0, 0.0], make_result("b"), index_name="other")
+
+        cache.invalidate("idx")
+
+        assert cache.get("idx", [1.0, 0.0], 5) is None
+        assert cache.get("other", [1.0, 0.0], 5).ids == [["b"]]
+
+    def test_invalidate_all(self, cache):
+        """Invalidating without an index drops everything"""
+        self.put(cache, [1.0, 0.0], make_result("a"))
+
+        cache.invalidate()
+
+        assert cache.get("idx", [1.0, 0.0], 5) is None
+
+    def test_stale_put_after_invalidation_is_skipped(self, cache):
+        """A search that started before a write does not cache its result"""
+        generation = cache.generation()
+        cache.invalidate("idx")
+        cache.put("idx", [1.0, 0.0], 5, make_result("a"), generation)
+
+        generation = cache.generation()
+        cache.invalidate()
+        cache.put("idx", [1.0, 0.0], 5, make_result("a"), generation)
+
+        assert cache.get("idx", [1.0, 0.0], 5) is None
+
+    def test_generation_is_a_single_counter(self, cache):
+        """Invalidating many indices does not grow any per-index state"""
+        for i in range(100):
+            cache.invalidate(f"idx{i}")
+
+        assert cache.generation() == 100
+        self.put(cache, [1.0, 0.0], make_result("a"))
+        assert cache.get("idx", [1.0, 0.0], 5) is not None
+
+    def test_zero_vector_is_not_cached(self, cache):
+        """Vectors without a direction are neither cached nor looked up"""
+        self.put(cache, [0.0, 0.0], make_result("a"))
+
+        assert cache._entries == {}
+        assert cache.get("idx", [0.0, 0.0], 5) is None